@@ -3,43 +3,107 @@
 Generate minimalist/abstract visual assets for Lich's Portfolio.
 Creates simple geometric icons and UI textures programmatically.
 
+Requires Pillow and NumPy. Pillow-SIMD 9.x is a drop-in replacement
+with SSE4/AVX2 fill, composite and resample loops and is the recommended
+install:
+
+    pip uninstall pillow
+    CC="cc -mavx2" pip install "pillow-simd>=9,<10"
+
+No code changes are needed to switch between the two.
+
+PNGs are written with light zlib compression to keep the edit/regenerate
+loop fast. Pass --ship for a release build to recompress every output
+with oxipng when it is on PATH.
+
+When basisu is on PATH, every PNG also gets a mipmapped UASTC .ktx2
+texture written next to it, so the game can upload GPU-ready data
+instead of decoding PNGs at load time. The step is skipped otherwise.
+
 Copyright (C) 2026 Zach Podbielniak
 SPDX-License-Identifier: AGPL-3.0-or-later
 """
 
+import io
 import os
-import math
+import sys
+import json
+import shutil
+import pickle
+import hashlib
+import argparse
+import functools
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import PIL
 from PIL import Image, ImageDraw, ImageFont
 
-# Color palette from PLAN.md theme
+# Image.Resampling arrived in Pillow 9.1; Pillow-SIMD 9.0 only has the
+# module-level constants.
+try:
+    LANCZOS = Image.Resampling.LANCZOS
+except AttributeError:
+    LANCZOS = Image.LANCZOS
+
+# Color palette from PLAN.md theme, stored as RGBA so PIL draws them as-is
 COLORS = {
-    'primary': (45, 27, 78),        # Deep purple #2d1b4e
-    'secondary': (232, 224, 213),   # Bone white #e8e0d5
-    'accent': (201, 162, 39),       # Gold #c9a227
-    'background': (10, 10, 15),     # Near black #0a0a0f
-    'text': (212, 208, 200),        # Off-white #d4d0c8
+    'primary': (45, 27, 78, 255),       # Deep purple #2d1b4e
+    'secondary': (232, 224, 213, 255),  # Bone white #e8e0d5
+    'accent': (201, 162, 39, 255),      # Gold #c9a227
+    'background': (10, 10, 15, 255),    # Near black #0a0a0f
+    'text': (212, 208, 200, 255),       # Off-white #d4d0c8
     'transparent': (0, 0, 0, 0),
 }
 
 # Investment type colors
 INVESTMENT_COLORS = {
-    'property': (139, 90, 43),      # Brown - earth/land
-    'trade': (65, 105, 225),        # Royal blue - commerce
-    'financial': (201, 162, 39),    # Gold - money
-    'magical': (148, 0, 211),       # Purple - arcane
-    'political': (178, 34, 34),     # Dark red - power
-    'dark': (20, 20, 25),           # Near black - forbidden
+    'property': (139, 90, 43, 255),     # Brown - earth/land
+    'trade': (65, 105, 225, 255),       # Royal blue - commerce
+    'financial': (201, 162, 39, 255),   # Gold - money
+    'magical': (148, 0, 211, 255),      # Purple - arcane
+    'political': (178, 34, 34, 255),    # Dark red - power
+    'dark': (20, 20, 25, 255),          # Near black - forbidden
 }
 
 # Agent type colors
 AGENT_COLORS = {
-    'individual': (169, 169, 169),  # Gray - mortal
-    'family': (218, 165, 32),       # Goldenrod - dynasty
-    'cult': (75, 0, 130),           # Indigo - devotion
-    'bound': (0, 100, 0),           # Dark green - undeath
+    'individual': (169, 169, 169, 255), # Gray - mortal
+    'family': (218, 165, 32, 255),      # Goldenrod - dynasty
+    'cult': (75, 0, 130, 255),          # Indigo - devotion
+    'bound': (0, 100, 0, 255),          # Dark green - undeath
 }
 
 ASSETS_DIR = os.path.join(os.path.dirname(__file__), '..', 'assets')
+# Output paths are relative to ASSETS_DIR and joined onto this prefix
+ASSETS_PREFIX = ASSETS_DIR + os.sep
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '.asset_cache')
+BASISU = shutil.which('basisu')
+
+# Any edit to this script changes the drawing code, so it keys the caches
+with open(__file__, 'rb') as _f:
+    SOURCE_HASH = hashlib.sha256(_f.read()).hexdigest()[:16]
+
+
+# Icons are drawn at this multiple of their output size, then downsampled
+_SUPER = 4
+
+# Progress lines, written out in one go at the end of main(). Warnings
+# bypass this and go straight to stderr.
+_log = []
+
+
+def log(message):
+    """Queue a progress line for flush_log()."""
+    _log.append(message)
+
+
+def flush_log():
+    """Write all queued progress lines to stdout and clear the queue."""
+    if _log:
+        sys.stdout.write('\n'.join(_log) + '\n')
+        sys.stdout.flush()
+        _log.clear()
 
 
 def ensure_dir(path):
@@ -47,19 +111,202 @@ def ensure_dir(path):
     os.makedirs(path, exist_ok=True)
 
 
-def draw_rounded_rect(draw, xy, radius, fill):
-    """Draw a rounded rectangle."""
+def cached_asset(create):
+    """Memoize an asset creator in memory and in CACHE_DIR/SOURCE_HASH.
+
+    Disk entries are keyed on the creator name, its arguments and the
+    Pillow version. List arguments such as colors are converted to tuples
+    so they can be cached. Every call returns a fresh copy of the cached
+    image, so callers are free to draw on it.
+    """
+    cache_dir = os.path.join(CACHE_DIR, SOURCE_HASH)
+
+    @functools.lru_cache(maxsize=None)
+    def cached(*args, **kwargs):
+        key = repr((create.__name__, args, sorted(kwargs.items()), PIL.__version__))
+        path = os.path.join(cache_dir, hashlib.sha256(key.encode()).hexdigest()[:32] + '.pickle')
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+        img = create(*args, **kwargs)
+        # Workers may race on the same entry; write aside and rename
+        ensure_dir(cache_dir)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(img, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        return img
+
+    @functools.wraps(create)
+    def wrapper(*args, **kwargs):
+        args = tuple(tuple(a) if isinstance(a, list) else a for a in args)
+        kwargs = {k: tuple(v) if isinstance(v, list) else v for k, v in kwargs.items()}
+        return cached(*args, **kwargs).copy()
+    return wrapper
+
+
+def prune_cache():
+    """Delete cache entries written by other versions of this script."""
+    try:
+        entries = list(os.scandir(CACHE_DIR))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.name == SOURCE_HASH:
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            os.remove(entry.path)
+
+
+def save_png(img, path):
+    """Save a PNG with fast, light compression.
+
+    The PNG is encoded into memory first and written with raw os calls,
+    one open and (usually) one write per file instead of Pillow's
+    buffered file handling.
+    """
+    buf = io.BytesIO()
+    img.save(buf, format='PNG', compress_level=1, optimize=False)
+    data = buf.getbuffer()
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+
+def optimize_pngs(paths):
+    """Losslessly recompress PNGs with oxipng for a ship build."""
+    oxipng = shutil.which('oxipng')
+    if oxipng is None:
+        print("warning: oxipng not found, leaving PNGs at fast compression", file=sys.stderr)
+        return
+    subprocess.run([oxipng, '--quiet', '-o', '4', '--strip', 'safe', *paths], check=True)
+    log(f"  Optimized {len(paths)} PNGs with oxipng")
+
+
+def ktx2_path(path):
+    """Return the .ktx2 path that sits next to a PNG."""
+    return os.path.splitext(path)[0] + '.ktx2'
+
+
+def encode_ktx2(path):
+    """Encode a PNG to a mipmapped UASTC KTX2 texture with basisu."""
+    subprocess.run([BASISU, '-ktx2', '-uastc', '-mipmap', '-file', path,
+                    '-output_path', os.path.dirname(path)],
+                   check=True, stdout=subprocess.DEVNULL)
+
+
+def supersampled(draw_icon):
+    """Turn an icon drawing function that works at _SUPER scale into a creator.
+
+    draw_icon draws on a canvas _SUPER times the requested size, and the
+    creator downsamples it to that size. draw_icon stays reachable as
+    create.draw_supersampled so render_sizes() can resample the big canvas
+    straight to every output size instead of going through LANCZOS twice.
+    """
+    @functools.wraps(draw_icon)
+    def create(*args, **kwargs):
+        img = draw_icon(*args, **kwargs)
+        size = img.width // _SUPER
+        return img.resize((size, size), LANCZOS)
+    create.draw_supersampled = draw_icon
+    return create
+
+
+def render_sizes(create, sizes, downsample=True, **kwargs):
+    """Yield (size, image) for each size, rendering once at the largest.
+
+    Smaller sizes are LANCZOS-downsampled from the largest render, or from
+    its supersampled canvas for @supersampled creators. Pass
+    downsample=False for assets with fixed-pixel strokes that would wash
+    out when scaled down; those are rendered at every size instead.
+    """
+    largest = max(sizes)
+    draw = getattr(create, 'draw_supersampled', None)
+    if downsample and draw is not None:
+        canvas = draw(size=largest, **kwargs)
+        for size in sizes:
+            yield size, canvas.resize((size, size), LANCZOS)
+        return
+    base = create(size=largest, **kwargs) if downsample else None
+    for size in sizes:
+        if base is None:
+            yield size, create(size=size, **kwargs)
+        elif size == largest:
+            yield size, base
+        else:
+            yield size, base.resize((size, size), LANCZOS)
+
+
+@functools.lru_cache(maxsize=32)
+def _corner_masks(radius):
+    """Return the (top-left, top-right, bottom-left, bottom-right) corner masks.
+
+    Each is an (r+1)x(r+1) boolean array holding one quarter-disc,
+    rasterized once per radius and shared by every rounded rectangle.
+    """
+    d = 2 * radius
+    disc = Image.new('L', (d + 1, d + 1), 0)
+    draw = ImageDraw.Draw(disc)
+    draw.pieslice([0, 0, d, d], 180, 270, fill=255)
+    draw.pieslice([0, 0, d, d], 270, 360, fill=255)
+    draw.pieslice([0, 0, d, d], 90, 180, fill=255)
+    draw.pieslice([0, 0, d, d], 0, 90, fill=255)
+    disc = np.asarray(disc) > 0
+    return (disc[:radius + 1, :radius + 1], disc[:radius + 1, radius:],
+            disc[radius:, :radius + 1], disc[radius:, radius:])
+
+
+def draw_rounded_rect(buf, xy, radius, fill):
+    """Draw a rounded rectangle into an (h, w, 4) buffer with an RGBA fill."""
+    x0, y0, x1, y1 = xy
+    buf[y0:y1 + 1, x0 + radius:x1 - radius + 1] = fill
+    buf[y0 + radius:y1 - radius + 1, x0:x1 + 1] = fill
+    corners = [(x0, y0), (x1 - radius, y0), (x0, y1 - radius), (x1 - radius, y1 - radius)]
+    for mask, (x, y) in zip(_corner_masks(radius), corners):
+        buf[y:y + radius + 1, x:x + radius + 1][mask] = fill
+
+
+@functools.lru_cache(maxsize=None)
+def _ellipse_mask(w, h):
+    """'L' mask of a filled ellipse spanning a w x h box."""
+    mask = Image.new('L', (w, h), 0)
+    ImageDraw.Draw(mask).ellipse([0, 0, w - 1, h - 1], fill=255)
+    return mask
+
+
+def draw_ellipse_pair(img, xy, right_x, fill):
+    """Fill an ellipse and a same-sized copy at right_x from one mask."""
     x0, y0, x1, y1 = xy
-    draw.rectangle([x0 + radius, y0, x1 - radius, y1], fill=fill)
-    draw.rectangle([x0, y0 + radius, x1, y1 - radius], fill=fill)
-    draw.pieslice([x0, y0, x0 + 2*radius, y0 + 2*radius], 180, 270, fill=fill)
-    draw.pieslice([x1 - 2*radius, y0, x1, y0 + 2*radius], 270, 360, fill=fill)
-    draw.pieslice([x0, y1 - 2*radius, x0 + 2*radius, y1], 90, 180, fill=fill)
-    draw.pieslice([x1 - 2*radius, y1 - 2*radius, x1, y1], 0, 90, fill=fill)
+    mask = _ellipse_mask(x1 - x0 + 1, y1 - y0 + 1)
+    img.paste(fill, (x0, y0), mask)
+    img.paste(fill, (right_x, y0), mask)
 
 
+def draw_rect_outline(buf, xy, width, color):
+    """Draw an RGBA rectangle outline into an (h, w, 4) buffer, like ImageDraw."""
+    x0, y0, x1, y1 = xy
+    buf[y0:y0 + width, x0:x1 + 1] = color
+    buf[y1 - width + 1:y1 + 1, x0:x1 + 1] = color
+    buf[y0:y1 + 1, x0:x0 + width] = color
+    buf[y0:y1 + 1, x1 - width + 1:x1 + 1] = color
+
+
+@cached_asset
+@supersampled
 def create_investment_icon(name, color, size=64):
-    """Create a minimalist investment category icon."""
+    """Create a minimalist investment category icon.
+
+    Drawn on a canvas _SUPER times the requested size; @supersampled
+    downsamples it, which anti-aliases the polygon and ellipse edges.
+    """
+    size *= _SUPER
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
     
@@ -74,7 +321,7 @@ def create_investment_icon(name, color, size=64):
             (size - margin, center),    # roof right
         ]
         draw.polygon(points, fill=color)
-        draw.rectangle([margin + 4, center, size - margin - 4, size - margin], fill=color)
+        draw.rectangle([margin + 4 * _SUPER, center, size - margin - 4 * _SUPER, size - margin], fill=color)
         
     elif name == 'trade':
         # Two arrows crossing - exchange
@@ -100,17 +347,12 @@ def create_investment_icon(name, color, size=64):
         
     elif name == 'magical':
         # Star/pentagram
-        points = []
-        for i in range(5):
-            angle = math.radians(i * 72 - 90)
-            x = center + int((center - margin) * math.cos(angle))
-            y = center + int((center - margin) * math.sin(angle))
-            points.append((x, y))
-            angle2 = math.radians(i * 72 - 90 + 36)
-            x2 = center + int((center - margin) * 0.4 * math.cos(angle2))
-            y2 = center + int((center - margin) * 0.4 * math.sin(angle2))
-            points.append((x2, y2))
-        draw.polygon(points, fill=color)
+        # Alternate outer tips and inner notches every 36 degrees
+        angles = np.deg2rad(np.arange(10) * 36 - 90)
+        radii = np.where(np.arange(10) % 2, (center - margin) * 0.4, center - margin)
+        xs = center + (radii * np.cos(angles)).astype(int)
+        ys = center + (radii * np.sin(angles)).astype(int)
+        draw.polygon(list(zip(xs.tolist(), ys.tolist())), fill=color)
         
     elif name == 'political':
         # Crown shape
@@ -131,22 +373,28 @@ def create_investment_icon(name, color, size=64):
     elif name == 'dark':
         # Skull silhouette (simplified)
         # Outer skull shape
-        draw.ellipse([margin + 4, margin, size - margin - 4, size - margin - size // 4], fill=color)
+        draw.ellipse([margin + 4 * _SUPER, margin, size - margin - 4 * _SUPER, size - margin - size // 4], fill=color)
         # Jaw
         draw.rectangle([margin + size // 5, size - margin - size // 3, size - margin - size // 5, size - margin], fill=color)
         # Eye sockets (dark)
         eye_size = size // 6
         eye_y = center - size // 8
-        draw.ellipse([center - size // 4 - eye_size // 2, eye_y - eye_size // 2,
-                      center - size // 4 + eye_size // 2, eye_y + eye_size // 2], fill=COLORS['background'])
-        draw.ellipse([center + size // 4 - eye_size // 2, eye_y - eye_size // 2,
-                      center + size // 4 + eye_size // 2, eye_y + eye_size // 2], fill=COLORS['background'])
+        draw_ellipse_pair(img, [center - size // 4 - eye_size // 2, eye_y - eye_size // 2,
+                                center - size // 4 + eye_size // 2, eye_y + eye_size // 2],
+                          center + size // 4 - eye_size // 2, COLORS['background'])
     
     return img
 
 
+@cached_asset
+@supersampled
 def create_agent_icon(name, color, size=64):
-    """Create a minimalist agent type icon."""
+    """Create a minimalist agent type icon.
+
+    Drawn on a canvas _SUPER times the requested size; @supersampled
+    downsamples it, which anti-aliases the polygon and ellipse edges.
+    """
+    size *= _SUPER
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
     
@@ -159,8 +407,8 @@ def create_agent_icon(name, color, size=64):
         draw.ellipse([center - head_r, margin, center + head_r, margin + head_r * 2], fill=color)
         # Body
         draw.polygon([
-            (center - size // 4, margin + head_r * 2 + 2),
-            (center + size // 4, margin + head_r * 2 + 2),
+            (center - size // 4, margin + head_r * 2 + 2 * _SUPER),
+            (center + size // 4, margin + head_r * 2 + 2 * _SUPER),
             (center + size // 3, size - margin),
             (center - size // 3, size - margin),
         ], fill=color)
@@ -171,13 +419,13 @@ def create_agent_icon(name, color, size=64):
         # Parent (center top)
         draw.ellipse([center - head_r, margin, center + head_r, margin + head_r * 2], fill=color)
         # Children (left and right bottom)
-        draw.ellipse([margin + size // 8 - head_r, center, margin + size // 8 + head_r, center + head_r * 2], fill=color)
-        draw.ellipse([size - margin - size // 8 - head_r, center, size - margin - size // 8 + head_r, center + head_r * 2], fill=color)
+        draw_ellipse_pair(img, [margin + size // 8 - head_r, center, margin + size // 8 + head_r, center + head_r * 2],
+                          size - margin - size // 8 - head_r, color)
         # Connection lines
-        draw.line([(center, margin + head_r * 2), (center, center - head_r)], fill=color, width=2)
-        draw.line([(margin + size // 8, center - head_r), (size - margin - size // 8, center - head_r)], fill=color, width=2)
-        draw.line([(margin + size // 8, center - head_r), (margin + size // 8, center)], fill=color, width=2)
-        draw.line([(size - margin - size // 8, center - head_r), (size - margin - size // 8, center)], fill=color, width=2)
+        draw.line([(center, margin + head_r * 2), (center, center - head_r)], fill=color, width=2 * _SUPER)
+        draw.line([(margin + size // 8, center - head_r), (size - margin - size // 8, center - head_r)], fill=color, width=2 * _SUPER)
+        draw.line([(margin + size // 8, center - head_r), (margin + size // 8, center)], fill=color, width=2 * _SUPER)
+        draw.line([(size - margin - size // 8, center - head_r), (size - margin - size // 8, center)], fill=color, width=2 * _SUPER)
         
     elif name == 'cult':
         # Hooded figure with symbol
@@ -191,7 +439,8 @@ def create_agent_icon(name, color, size=64):
             (center + hood_w, center + size // 6),
         ], fill=color)
         # Eye glow
-        draw.ellipse([center - 3, center - 2, center + 3, center + 4], fill=COLORS['accent'])
+        draw.ellipse([center - 3 * _SUPER, center - 2 * _SUPER,
+                      center + 3 * _SUPER, center + 4 * _SUPER], fill=COLORS['accent'])
         
     elif name == 'bound':
         # Chained figure
@@ -203,54 +452,55 @@ def create_agent_icon(name, color, size=64):
         chain_r = size // 16
         for i in range(3):
             y = margin + i * size // 4
-            draw.ellipse([margin - chain_r, y, margin + chain_r, y + chain_r * 2], outline=COLORS['accent'], width=2)
-            draw.ellipse([size - margin - chain_r, y, size - margin + chain_r, y + chain_r * 2], outline=COLORS['accent'], width=2)
+            draw.ellipse([margin - chain_r, y, margin + chain_r, y + chain_r * 2], outline=COLORS['accent'], width=2 * _SUPER)
+            draw.ellipse([size - margin - chain_r, y, size - margin + chain_r, y + chain_r * 2], outline=COLORS['accent'], width=2 * _SUPER)
     
     return img
 
 
 def create_ui_panel(size=(256, 128)):
     """Create a UI panel background texture."""
-    img = Image.new('RGBA', size, COLORS['background'] + (240,))
-    draw = ImageDraw.Draw(img)
+    w, h = size
+    buf = np.empty((h, w, 4), np.uint8)
+    buf[...] = COLORS['background'][:3] + (240,)
     
     # Border
     border = 2
-    draw.rectangle([0, 0, size[0] - 1, size[1] - 1], outline=COLORS['accent'], width=border)
+    draw_rect_outline(buf, (0, 0, w - 1, h - 1), border, COLORS['accent'])
     
     # Inner border
     inner = 4
-    draw.rectangle([inner, inner, size[0] - inner - 1, size[1] - inner - 1], outline=COLORS['primary'], width=1)
+    draw_rect_outline(buf, (inner, inner, w - inner - 1, h - inner - 1), 1, COLORS['primary'])
     
     # Corner decorations
     corner_size = 8
-    for x in [inner, size[0] - inner - corner_size]:
-        for y in [inner, size[1] - inner - corner_size]:
-            draw.rectangle([x, y, x + corner_size, y + corner_size], fill=COLORS['accent'])
+    for x in [inner, w - inner - corner_size]:
+        for y in [inner, h - inner - corner_size]:
+            buf[y:y + corner_size + 1, x:x + corner_size + 1] = COLORS['accent']
     
-    return img
+    return Image.fromarray(buf)
 
 
 def create_button(size=(128, 48), state='normal'):
     """Create a button texture."""
-    img = Image.new('RGBA', size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
+    w, h = size
+    buf = np.zeros((h, w, 4), np.uint8)
     
     if state == 'normal':
         fill = COLORS['primary']
         outline = COLORS['accent']
     elif state == 'hover':
-        fill = (65, 47, 98)  # Lighter purple
+        fill = (65, 47, 98, 255)  # Lighter purple
         outline = COLORS['accent']
     elif state == 'pressed':
-        fill = (25, 17, 58)  # Darker purple
+        fill = (25, 17, 58, 255)  # Darker purple
         outline = COLORS['secondary']
     
     # Rounded rectangle button
-    draw_rounded_rect(draw, [0, 0, size[0] - 1, size[1] - 1], 6, fill)
-    draw.rectangle([0, 0, size[0] - 1, size[1] - 1], outline=outline, width=2)
+    draw_rounded_rect(buf, (0, 0, w - 1, h - 1), 6, fill)
+    draw_rect_outline(buf, (0, 0, w - 1, h - 1), 2, outline)
     
-    return img
+    return Image.fromarray(buf)
 
 
 def create_logo(size=256):
@@ -267,10 +517,9 @@ def create_logo(size=256):
     # Eye sockets with gold glow
     eye_size = size // 5
     eye_y = center - size // 10
-    draw.ellipse([center - size // 4 - eye_size // 2, eye_y - eye_size // 2,
-                  center - size // 4 + eye_size // 2, eye_y + eye_size // 2], fill=COLORS['background'])
-    draw.ellipse([center + size // 4 - eye_size // 2, eye_y - eye_size // 2,
-                  center + size // 4 + eye_size // 2, eye_y + eye_size // 2], fill=COLORS['background'])
+    draw_ellipse_pair(img, [center - size // 4 - eye_size // 2, eye_y - eye_size // 2,
+                            center - size // 4 + eye_size // 2, eye_y + eye_size // 2],
+                      center + size // 4 - eye_size // 2, COLORS['background'])
     
     # Gold coins overlaid (portfolio)
     coin_r = size // 6
@@ -286,11 +535,10 @@ def create_logo(size=256):
 
 def create_exposure_meter(size=(200, 24)):
     """Create exposure meter background."""
-    img = Image.new('RGBA', size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
     # Background bar
-    draw.rectangle([0, 0, size[0] - 1, size[1] - 1], fill=COLORS['background'], outline=COLORS['secondary'], width=1)
+    img = Image.new('RGBA', size, COLORS['background'])
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, size[0] - 1, size[1] - 1], outline=COLORS['secondary'], width=1)
     
     # Threshold markers
     thresholds = [0.25, 0.50, 0.75]
@@ -301,26 +549,43 @@ def create_exposure_meter(size=(200, 24)):
     return img
 
 
+@functools.lru_cache(maxsize=None)
+def _disc_mask(radius):
+    """Boolean (2r+1)x(2r+1) mask of a filled disc of the given radius."""
+    d = np.arange(-radius, radius + 1)
+    return d[:, None] ** 2 + d[None, :] ** 2 <= radius * radius
+
+
+def _paint_spots(buf, xs, ys, rs, colors):
+    """Paint filled discs into an (h, w, 4) buffer, later spots on top."""
+    h, w = buf.shape[:2]
+    for x, y, r, color in zip(xs, ys, rs, colors):
+        x0, y0 = max(x - r, 0), max(y - r, 0)
+        x1, y1 = min(x + r + 1, w), min(y + r + 1, h)
+        if x0 >= x1 or y0 >= y1:
+            continue
+        mask = _disc_mask(r)[y0 - y + r:y1 - y + r, x0 - x + r:x1 - x + r]
+        buf[y0:y1, x0:x1, :3][mask] = color
+
+
 def create_world_map_background(size=(512, 512)):
     """Create a parchment-style world map background."""
-    img = Image.new('RGBA', size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
     # Parchment base color
     parchment = (218, 197, 165)
-    draw.rectangle([0, 0, size[0] - 1, size[1] - 1], fill=parchment)
+    buf = np.empty((size[1], size[0], 4), np.uint8)
+    buf[...] = parchment + (255,)
     
     # Add some aged spots/variation
-    import random
-    random.seed(42)  # Reproducible
-    for _ in range(100):
-        x = random.randint(0, size[0])
-        y = random.randint(0, size[1])
-        r = random.randint(5, 20)
-        shade = random.randint(-20, 20)
-        spot_color = (parchment[0] + shade, parchment[1] + shade, parchment[2] + shade - 10)
-        spot_color = tuple(max(0, min(255, c)) for c in spot_color)
-        draw.ellipse([x - r, y - r, x + r, y + r], fill=spot_color)
+    rng = np.random.default_rng(42)  # Reproducible
+    xs = rng.integers(0, size[0], 100, endpoint=True)
+    ys = rng.integers(0, size[1], 100, endpoint=True)
+    rs = rng.integers(5, 20, 100, endpoint=True)
+    shades = rng.integers(-20, 20, 100, endpoint=True)
+    colors = np.clip(np.array(parchment) + shades[:, None] + (0, 0, -10), 0, 255).astype(np.uint8)
+    _paint_spots(buf, xs, ys, rs, colors)
+    
+    img = Image.fromarray(buf)
+    draw = ImageDraw.Draw(img)
     
     # Border
     border = 8
@@ -330,6 +595,7 @@ def create_world_map_background(size=(512, 512)):
     return img
 
 
+@cached_asset
 def create_kingdom_marker(size=32, color=None):
     """Create a kingdom marker for the world map."""
     if color is None:
@@ -358,47 +624,57 @@ def create_kingdom_marker(size=32, color=None):
     return img
 
 
+@functools.lru_cache(maxsize=None)
+def _polygon_mask(size, points):
+    """Boolean mask of a filled polygon on a size x size tile."""
+    mask = Image.new('L', (size, size), 0)
+    ImageDraw.Draw(mask).polygon(points, fill=255)
+    return np.asarray(mask) > 0
+
+
+@cached_asset
 def create_region_terrain(terrain_type, size=64):
     """Create terrain tile for a region type."""
-    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
+    if terrain_type == 'inland':
+        # Green plains
+        return Image.new('RGBA', (size, size), (107, 142, 35, 255))
+    
+    tile = np.zeros((size, size, 4), np.uint8)
     
     if terrain_type == 'coastal':
         # Blue water with land edge
-        draw.rectangle([0, 0, size - 1, size - 1], fill=(100, 149, 237))
-        draw.polygon([(0, 0), (size // 2, 0), (0, size // 2)], fill=(139, 119, 101))
-    elif terrain_type == 'inland':
-        # Green plains
-        draw.rectangle([0, 0, size - 1, size - 1], fill=(107, 142, 35))
+        tile[...] = (100, 149, 237, 255)
+        tile[_polygon_mask(size, ((0, 0), (size // 2, 0), (0, size // 2)))] = (139, 119, 101, 255)
     elif terrain_type == 'mountain':
         # Gray peaks
-        draw.rectangle([0, 0, size - 1, size - 1], fill=(119, 136, 153))
+        tile[...] = (119, 136, 153, 255)
         # Mountain shape
-        draw.polygon([
+        tile[_polygon_mask(size, (
             (size // 2, size // 6),
             (size // 6, size - size // 6),
             (size - size // 6, size - size // 6),
-        ], fill=(169, 169, 169))
+        ))] = (169, 169, 169, 255)
         # Snow cap
-        draw.polygon([
+        tile[_polygon_mask(size, (
             (size // 2, size // 6),
             (size // 3, size // 3),
             (size - size // 3, size // 3),
-        ], fill=(255, 255, 255))
+        ))] = (255, 255, 255, 255)
     elif terrain_type == 'forest':
         # Dark green with tree shapes
-        draw.rectangle([0, 0, size - 1, size - 1], fill=(34, 85, 34))
+        tile[...] = (34, 85, 34, 255)
         # Tree triangles
         for x in [size // 4, size // 2, 3 * size // 4]:
-            draw.polygon([
+            tile[_polygon_mask(size, (
                 (x, size // 4),
                 (x - size // 6, size - size // 4),
                 (x + size // 6, size - size // 4),
-            ], fill=(0, 100, 0))
+            ))] = (0, 100, 0, 255)
     
-    return img
+    return Image.fromarray(tile)
 
 
+@cached_asset
 def create_controller_button(button_type, size=64):
     """Create a controller button glyph icon."""
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
@@ -409,10 +685,10 @@ def create_controller_button(button_type, size=64):
     
     # Button colors (Xbox style)
     button_colors = {
-        'a': (106, 175, 80),    # Green
-        'b': (215, 85, 65),     # Red
-        'x': (85, 160, 210),    # Blue
-        'y': (245, 185, 55),    # Yellow
+        'a': (106, 175, 80, 255),   # Green
+        'b': (215, 85, 65, 255),    # Red
+        'x': (85, 160, 210, 255),   # Blue
+        'y': (245, 185, 55, 255),   # Yellow
         'lb': COLORS['secondary'],
         'rb': COLORS['secondary'],
         'lt': COLORS['secondary'],
@@ -501,105 +777,167 @@ def create_controller_button(button_type, size=64):
     return img
 
 
-def main():
-    """Generate all assets."""
-    print("Generating assets for Lich's Portfolio...")
+def _render_and_save(task):
+    """Render one asset task and save its PNGs; runs in a worker process.
+
+    A task is (label, create, kwargs, outputs, downsample), where outputs
+    is a list of (size, path) with paths relative to ASSETS_DIR. A size of
+    None means the asset is rendered once with kwargs as given instead of
+    going through render_sizes().
+    """
+    label, create, kwargs, outputs, downsample = task
+    sizes = [size for size, _ in outputs]
+    if sizes == [None]:
+        images = [create(**kwargs)]
+    else:
+        images = [img for _, img in render_sizes(create, sizes, downsample, **kwargs)]
+    for (_, path), img in zip(outputs, images):
+        save_png(img, ASSETS_PREFIX + path)
+        if BASISU is not None:
+            encode_ktx2(ASSETS_PREFIX + path)
+    return label
+
+
+def load_build_hashes(path):
+    """Load the {relpath: SOURCE_HASH} sidecar, or {} if it is unusable."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_build_hashes(path, hashes):
+    """Atomically replace the build hash sidecar."""
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(hashes, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp, path)
+
+
+def generate_all(args):
+    """Render every asset and write the manifest."""
+    log("Generating assets for Lich's Portfolio...")
+    tasks = []
+    
+    # Output directories, relative to ASSETS_DIR
+    icons_dir = 'textures/icons/investments'
+    agents_dir = 'textures/icons/agents'
+    ui_dir = 'textures/ui'
+    world_dir = 'textures/world'
+    glyphs_dir = 'textures/glyphs'
+    output_dirs = [icons_dir, agents_dir, ui_dir, world_dir, glyphs_dir]
+    for d in output_dirs:
+        ensure_dir(ASSETS_PREFIX + d)
     
     # Investment icons
-    icons_dir = os.path.join(ASSETS_DIR, 'textures', 'icons', 'investments')
-    ensure_dir(icons_dir)
     for name, color in INVESTMENT_COLORS.items():
-        for size in [32, 64, 128]:
-            icon = create_investment_icon(name, color, size)
-            icon.save(os.path.join(icons_dir, f'{name}_{size}.png'))
-            print(f"  Created investment icon: {name}_{size}.png")
+        # The house body and skull are inset by a fixed 4px
+        downsample = name not in ('property', 'dark')
+        outputs = [(size, f'{icons_dir}/{name}_{size}.png') for size in [32, 64, 128]]
+        tasks.append((f"investment icon: {name}", create_investment_icon,
+                      {'name': name, 'color': color}, outputs, downsample))
     
     # Agent icons
-    agents_dir = os.path.join(ASSETS_DIR, 'textures', 'icons', 'agents')
-    ensure_dir(agents_dir)
     for name, color in AGENT_COLORS.items():
-        for size in [32, 64, 128]:
-            icon = create_agent_icon(name, color, size)
-            icon.save(os.path.join(agents_dir, f'{name}_{size}.png'))
-            print(f"  Created agent icon: {name}_{size}.png")
-    
-    # UI elements
-    ui_dir = os.path.join(ASSETS_DIR, 'textures', 'ui')
-    ensure_dir(ui_dir)
+        # Every agent has a fixed-pixel gap, line, chain or eye, so none
+        # of them can be downsampled
+        outputs = [(size, f'{agents_dir}/{name}_{size}.png') for size in [32, 64, 128]]
+        tasks.append((f"agent icon: {name}", create_agent_icon,
+                      {'name': name, 'color': color}, outputs, False))
     
     # Panels
     for w, h in [(256, 128), (256, 256), (512, 256)]:
-        panel = create_ui_panel((w, h))
-        panel.save(os.path.join(ui_dir, f'panel_{w}x{h}.png'))
-        print(f"  Created UI panel: panel_{w}x{h}.png")
+        tasks.append((f"UI panel: panel_{w}x{h}.png", create_ui_panel,
+                      {'size': (w, h)}, [(None, f'{ui_dir}/panel_{w}x{h}.png')], False))
     
     # Buttons
     for state in ['normal', 'hover', 'pressed']:
-        btn = create_button(state=state)
-        btn.save(os.path.join(ui_dir, f'button_{state}.png'))
-        print(f"  Created button: button_{state}.png")
+        tasks.append((f"button: button_{state}.png", create_button,
+                      {'state': state}, [(None, f'{ui_dir}/button_{state}.png')], False))
     
     # Exposure meter
-    meter = create_exposure_meter()
-    meter.save(os.path.join(ui_dir, 'exposure_meter_bg.png'))
-    print("  Created exposure meter background")
+    tasks.append(("exposure meter background", create_exposure_meter,
+                  {}, [(None, f'{ui_dir}/exposure_meter_bg.png')], False))
     
     # Logo
-    logo = create_logo(256)
-    logo.save(os.path.join(ui_dir, 'logo_256.png'))
-    logo_128 = create_logo(128)
-    logo_128.save(os.path.join(ui_dir, 'logo_128.png'))
-    print("  Created logo")
-    
-    # World map elements
-    world_dir = os.path.join(ASSETS_DIR, 'textures', 'world')
-    ensure_dir(world_dir)
+    outputs = [(size, f'{ui_dir}/logo_{size}.png') for size in [256, 128]]
+    tasks.append(("logo", create_logo, {}, outputs, False))
     
     # Map background
-    map_bg = create_world_map_background((512, 512))
-    map_bg.save(os.path.join(world_dir, 'map_background.png'))
-    print("  Created world map background")
+    tasks.append(("world map background", create_world_map_background,
+                  {'size': (512, 512)}, [(None, f'{world_dir}/map_background.png')], False))
     
     # Kingdom markers (different colors for different kingdoms)
     kingdom_colors = [
-        ('valdris', (178, 34, 34)),    # Dark red
-        ('meridia', (65, 105, 225)),   # Royal blue
-        ('thornwood', (34, 85, 34)),   # Forest green
-        ('ashmark', (128, 128, 128)),  # Gray
-        ('sunhold', (218, 165, 32)),   # Goldenrod
-        ('neutral', (169, 169, 169)),  # Light gray
+        ('valdris', (178, 34, 34, 255)),    # Dark red
+        ('meridia', (65, 105, 225, 255)),   # Royal blue
+        ('thornwood', (34, 85, 34, 255)),   # Forest green
+        ('ashmark', (128, 128, 128, 255)),  # Gray
+        ('sunhold', (218, 165, 32, 255)),   # Goldenrod
+        ('neutral', (169, 169, 169, 255)),  # Light gray
     ]
     for name, color in kingdom_colors:
-        for s in [24, 32, 48]:
-            marker = create_kingdom_marker(s, color)
-            marker.save(os.path.join(world_dir, f'kingdom_{name}_{s}.png'))
-        print(f"  Created kingdom marker: {name}")
+        # The tower base and flag sit a fixed 4px from the edges
+        outputs = [(s, f'{world_dir}/kingdom_{name}_{s}.png') for s in [24, 32, 48]]
+        tasks.append((f"kingdom marker: {name}", create_kingdom_marker,
+                      {'color': color}, outputs, False))
     
     # Terrain tiles
     for terrain in ['coastal', 'inland', 'mountain', 'forest']:
-        tile = create_region_terrain(terrain, 64)
-        tile.save(os.path.join(world_dir, f'terrain_{terrain}.png'))
-        print(f"  Created terrain tile: {terrain}")
+        tasks.append((f"terrain tile: {terrain}", create_region_terrain,
+                      {'terrain_type': terrain, 'size': 64},
+                      [(None, f'{world_dir}/terrain_{terrain}.png')], False))
     
     # Controller button glyphs
-    glyphs_dir = os.path.join(ASSETS_DIR, 'textures', 'glyphs')
-    ensure_dir(glyphs_dir)
-    
     button_types = ['a', 'b', 'x', 'y', 'lb', 'rb', 'lt', 'rt', 'dpad', 'start', 'back', 'stick_l', 'stick_r']
     for btn in button_types:
-        for s in [32, 48, 64]:
-            glyph = create_controller_button(btn, s)
-            glyph.save(os.path.join(glyphs_dir, f'xbox_{btn}_{s}.png'))
-        print(f"  Created controller glyph: {btn}")
+        # Stick outlines are a fixed 3px stroke
+        downsample = btn not in ('stick_l', 'stick_r')
+        outputs = [(s, f'{glyphs_dir}/xbox_{btn}_{s}.png') for s in [32, 48, 64]]
+        tasks.append((f"controller glyph: {btn}", create_controller_button,
+                      {'button_type': btn}, outputs, downsample))
+    
+    # Skip tasks whose outputs were all written by this exact script
+    build_hash_path = ASSETS_PREFIX + '.build_hash'
+    build_hashes = load_build_hashes(build_hash_path)
+    existing = set()
+    for d in output_dirs:
+        with os.scandir(ASSETS_PREFIX + d) as entries:
+            existing.update(f'{d}/{entry.name}' for entry in entries)
+    rel_paths = [path for task in tasks for _, path in task[3]]
+    stale = [task for task in tasks
+             if not all(path in existing and build_hashes.get(path) == SOURCE_HASH
+                        and (BASISU is None or ktx2_path(path) in existing)
+                        for _, path in task[3])]
+    skipped = len(rel_paths) - sum(len(task[3]) for task in stale)
+    if skipped:
+        log(f"  Skipped {skipped} up-to-date assets")
+    
+    prune_cache()
+    
+    # Every task writes its own files, so they can all run side by side
+    with ProcessPoolExecutor() as executor:
+        for label in executor.map(_render_and_save, stale):
+            log(f"  Created {label}")
+    
+    build_hashes.update(dict.fromkeys(rel_paths, SOURCE_HASH))
+    save_build_hashes(build_hash_path, build_hashes)
+    
+    if args.ship:
+        optimize_pngs([ASSETS_PREFIX + path for path in rel_paths])
     
     # Create asset manifest
-    manifest_path = os.path.join(ASSETS_DIR, 'manifest.yaml')
+    manifest_path = ASSETS_PREFIX + 'manifest.yaml'
+    formats = 'png, ktx2' if BASISU is not None else 'png'
     with open(manifest_path, 'w') as f:
-        f.write("""# Lich's Portfolio Asset Manifest
+        f.write(f"""# Lich's Portfolio Asset Manifest
 # Generated by tools/generate_assets.py
 
 version: 1
 generated: true
+formats: [{formats}]
 
 textures:
   icons:
@@ -642,10 +980,28 @@ textures:
 # No external licenses required
 licenses: []
 """)
-    print(f"  Created manifest: {manifest_path}")
+    log(f"  Created manifest: {manifest_path}")
     
-    print("\nAsset generation complete!")
-    print(f"Assets saved to: {ASSETS_DIR}")
+    log("")
+    log("Asset generation complete!")
+    log(f"Assets saved to: {ASSETS_DIR}")
+
+
+def main():
+    """Generate all assets."""
+    parser = argparse.ArgumentParser(description="Generate visual assets for Lich's Portfolio.")
+    parser.add_argument('--ship', action='store_true',
+                        help="recompress all PNGs with oxipng for a release build")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="do not print progress")
+    args = parser.parse_args()
+    
+    # Show whatever progress was made even if a step fails
+    try:
+        generate_all(args)
+    finally:
+        if not args.quiet:
+            flush_log()
 
 
 if __name__ == '__main__':